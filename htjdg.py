@@ -1,351 +1,814 @@
-#!/usr/bin/env python3
-"""
-Single-file app that combines:
-
-* FastAPI backend (port 8000) to accept large file uploads directly to disk (streamed)
-* Streamlit frontend (port 8501) for UI + controls, which uses a client-side uploader (bypasses Streamlit's file_uploader)
-  Run:
-  python app_single_file_streamlit_fastapi.py
-  This will:
-* start FastAPI (uvicorn) in a background thread on port 8000
-* spawn a Streamlit process that re-executes this file with --streamlit flag and runs the Streamlit UI
-
-Requirements (pip):
-fastapi uvicorn[standard] aiofiles python-multipart streamlit
-
-Notes:
-
-* The Streamlit UI provides a pure-browser uploader (JS) that uploads directly to FastAPI (so upload does not flow through Streamlit server memory).
-* Uploaded files are saved under ./uploads and appear in the Streamlit dropdown automatically.
-* This is intended for localhost / trusted environment. If deploying public-facing, add auth and TLS.
-  """
-
-import os
-import sys
-import threading
-import subprocess
-import time
-from pathlib import Path
-
-# ---------- Common configuration ----------
-
-UPLOAD_DIR = Path("./uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-FASTAPI_HOST = "0.0.0.0"
-FASTAPI_PORT = 8000
-STREAMLIT_PORT = 8501
-
-# ---------- FastAPI app (backend for chunked/large uploads) ----------
-
-def start_fastapi_app():
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-import aiofiles
-
-```
-app = FastAPI(title="Large Upload Backend")
-
-# Allow CORS for Streamlit frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/ping")
-async def ping():
-    return {"ok": True}
-
-@app.post("/upload")
-async def upload(file: UploadFile = File(...)):
-    """
-    Accepts a standard multipart/form-data upload with field name 'file'.
-    Writes file to disk in streaming fashion using aiofiles.
-    Returns simple JSON with filename and size.
-    """
-    # sanitize filename
-    filename = os.path.basename(file.filename)
-    if not filename:
-        raise HTTPException(status_code=400, detail="Missing filename")
-    dest_path = UPLOAD_DIR / filename
-
-    # If file already exists, save with incremental suffix
-    if dest_path.exists():
-        base, ext = os.path.splitext(filename)
-        counter = 1
-        while True:
-            candidate = UPLOAD_DIR / f"{base}({counter}){ext}"
-            if not candidate.exists():
-                dest_path = candidate
-                break
-            counter += 1
-
-    total_written = 0
-    CHUNK_SIZE = 1024 * 1024 * 4  # 4MB chunks
-
-    try:
-        async with aiofiles.open(dest_path, "wb") as out_file:
-            while True:
-                chunk = await file.read(CHUNK_SIZE)
-                if not chunk:
-                    break
-                await out_file.write(chunk)
-                total_written += len(chunk)
-    except Exception as e:
-        # attempt to remove partially written file
-        try:
-            if dest_path.exists():
-                dest_path.unlink()
-        except:
-            pass
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
-
-    return JSONResponse({"filename": str(dest_path.name), "size_bytes": total_written})
-
-import uvicorn
-# Running uvicorn.run in this thread will block — but function is executed inside a thread.
-uvicorn.run(app, host=FASTAPI_HOST, port=FASTAPI_PORT, log_level="info")
-```
-
-# ---------- Streamlit app (frontend) ----------
-
-def run_streamlit_app():
-import streamlit as st
-import streamlit.components.v1 as components
-import threading
-import os
-import time
-import shutil
-
-```
-st.set_page_config(page_title="YouTube Live — Upload Besar", layout="wide")
-st.title("YouTube Live — Upload Besar (Streamlit + FastAPI) 🎥")
-
-st.markdown(
-    """
-    #### Cara kerja singkat
-    - Backend FastAPI menerima upload **langsung** dari browser dan menulis ke disk per-chunk (bypass Streamlit memory).
-    - Gunakan tombol di bawah untuk memilih file yang sudah diupload (folder `./uploads`) lalu mulai streaming menggunakan `ffmpeg`.
-    - Jika ingin upload file besar: gunakan uploader browser (di bawah) — ia akan melakukan POST langsung ke FastAPI.
-    """
-)
-
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.subheader("Uploader browser (bypass Streamlit)")
-    st.markdown(
-        """
-        Pilih file (mp4, mkv, mov, flv, ...) lalu upload langsung ke backend FastAPI.
-        Progress bar ditampilkan. Upload besar (GB) didukung karena file ditulis langsung ke disk oleh FastAPI.
-        """
-    )
-
-    # HTML + JS uploader that posts directly to FastAPI/upload and shows progress
-    uploader_html = f"""
-    <div style="font-family: sans-serif;">
-      <input id="fileInput" type="file" />
-      <div style="margin-top:8px;">
-        <button id="uploadBtn">Upload ke backend</button>
-      </div>
-      <div id="progressWrap" style="margin-top:8px; display:none;">
-        <progress id="pbar" value="0" max="100" style="width:100%;"></progress>
-        <div id="status" style="font-size:12px;margin-top:6px;"></div>
-      </div>
-      <script>
-        const fileInput = document.getElementById('fileInput');
-        const uploadBtn = document.getElementById('uploadBtn');
-        const pbar = document.getElementById('pbar');
-        const status = document.getElementById('status');
-        const progressWrap = document.getElementById('progressWrap');
-
-        uploadBtn.addEventListener('click', () => {{
-          const f = fileInput.files[0];
-          if (!f) {{
-            alert('Pilih file dulu');
-            return;
-          }}
-          const url = '{'http://localhost:' + str(FASTAPI_PORT) + '/upload'}';
-          const form = new FormData();
-          form.append('file', f, f.name);
-
-          const xhr = new XMLHttpRequest();
-          xhr.open('POST', url, true);
-
-          xhr.upload.addEventListener('progress', (e) => {{
-            if (e.lengthComputable) {{
-              const pct = Math.round((e.loaded / e.total) * 100);
-              pbar.value = pct;
-              status.innerText = 'Uploading: ' + pct + '% — ' + (e.loaded / (1024*1024)).toFixed(2) + ' MB';
-              progressWrap.style.display = 'block';
-            }}
-          }});
-          xhr.onload = function() {{
-            if (xhr.status === 200) {{
-              status.innerText = 'Upload selesai: ' + xhr.responseText;
-              // inform Streamlit by sending a message to parent (Streamlit can capture it)
-              try {{
-                const payload = {{event: 'upload_done', response: xhr.responseText}};
-                window.parent.postMessage({{streamlitMessage: true, payload: payload}}, '*');
-              }} catch (e) {{
-                console.log('postMessage fail', e);
-              }}
-            }} else {{
-              status.innerText = 'Upload gagal. Status: ' + xhr.status + ' ' + xhr.responseText;
-            }}
-          }};
-          xhr.onerror = function() {{
-            status.innerText = 'Upload error (network).';
-          }};
-          xhr.send(form);
-        }});
-      </script>
-    </div>
-    """
-
-    # Render the uploader HTML. We will also capture messages via components. The return value will be None.
-    components.html(uploader_html, height=160, scrolling=True)
-
-    st.info("Catatan: Pastikan FastAPI backend berjalan di port 8000 (script ini menjalankannya otomatis).")
-
-    st.subheader("File yang tersedia di server (./uploads)")
-    files = sorted(os.listdir("uploads"))
-    selected_file = st.selectbox("Pilih file untuk streaming", options=["-- pilih --"] + files)
-    if selected_file and selected_file != "-- pilih --":
-        st.write(f"✅ File siap: uploads/{selected_file}")
-        video_path = os.path.abspath(os.path.join("uploads", selected_file))
-    else:
-        video_path = None
-
-with col2:
-    st.subheader("Kontrol Streaming (ffmpeg)")
-    stream_key = st.text_input("Stream Key YouTube (dibutuhkan untuk mulai)")
-    is_shorts = st.checkbox("Mode Shorts (720x1280)")
-
-    st.markdown("Tombol Start/Stop menjalankan/perintah `ffmpeg` pada mesin yang menjalankan aplikasi ini.")
-
-    start_btn = st.button("Mulai Streaming")
-    stop_btn = st.button("Hentikan Streaming")
-
-    log_box = st.empty()
-    log_lines = []
-
-    def append_log(s):
-        log_lines.append(s)
-        # show last 30 lines
-        log_box.text("\n".join(log_lines[-30:]))
-
-    # Simple ffmpeg runner in background
-    if 'ffmpeg_proc' not in st.session_state:
-        st.session_state.ffmpeg_proc = None
-
-    if start_btn:
-        if not video_path:
-            st.error("Pilih file dulu dari dropdown 'File yang tersedia di server'.")
-        elif not stream_key:
-            st.error("Masukkan stream key YouTube.")
-        else:
-            # Build ffmpeg command
-            scale_arg = ["-vf", "scale=720:1280"] if is_shorts else []
-            output_url = f"rtmp://a.rtmp.youtube.com/live2/{stream_key}"
-            cmd = [
-                "ffmpeg", "-re", "-stream_loop", "-1", "-i", video_path,
-                "-c:v", "libx264", "-preset", "veryfast", "-b:v", "2500k",
-                "-maxrate", "2500k", "-bufsize", "5000k",
-                "-g", "60", "-keyint_min", "60",
-                "-c:a", "aac", "-b:a", "128k",
-            ] + scale_arg + ["-f", "flv", output_url]
-
-            append_log("Menjalankan: " + " ".join(cmd))
-            try:
-                # start ffmpeg as subprocess; stream stdout
-                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-                st.session_state.ffmpeg_proc = proc
-
-                # thread to read output
-                def reader_thread(p):
-                    try:
-                        for ln in iter(p.stdout.readline, ""):
-                            if not ln:
-                                break
-                            append_log(ln.strip())
-                    except Exception as e:
-                        append_log("ffmpeg reader error: " + str(e))
-                t = threading.Thread(target=reader_thread, args=(proc,), daemon=True)
-                t.start()
-                st.success("Streaming dimulai — periksa log.")
-            except Exception as e:
-                append_log("Gagal menjalankan ffmpeg: " + str(e))
-                st.error("Gagal menjalankan ffmpeg. Pastikan ffmpeg terinstal di PATH.")
-
-    if stop_btn:
-        proc = st.session_state.get("ffmpeg_proc")
-        if proc:
-            proc.kill()
-            st.session_state.ffmpeg_proc = None
-            st.warning("Streaming dihentikan (ffmpeg killed).")
-            append_log("ffmpeg dihentikan oleh user.")
-        else:
-            st.info("Tidak ada proses ffmpeg berjalan.")
-
-st.markdown("---")
-st.markdown("**Catatan teknis & tips**")
-st.markdown(
-    """
-    - Uploader mengirim file langsung ke FastAPI yang menulis file ke `./uploads` dalam chunk (4MB).
-    - Jangan jalankan ini di server publik tanpa HTTPS dan otentikasi — tambahkan proteksi jika perlu.
-    - Jika ingin resume/partial upload, kita bisa tambahkan chunked-resume logic (lebih kompleks).
-    """
-)
-```
-
-# ---------- Entrypoint logic ----------
-
-def main():
-# If launched with --streamlit, run only the streamlit UI (this process is started by the launcher).
-if "--streamlit" in sys.argv:
-# Run only Streamlit app function
-run_streamlit_app()
-return
-
-```
-# Otherwise, this is the launcher process: start FastAPI in a background thread and spawn Streamlit
-print("Launcher: starting FastAPI backend thread...")
-fastapi_thread = threading.Thread(target=start_fastapi_app, daemon=True)
-fastapi_thread.start()
-
-# Wait a moment for FastAPI to boot
-time.sleep(1.2)
-
-# Launch Streamlit in a separate process that re-invokes this file with --streamlit flag
-print("Launcher: starting Streamlit process...")
-# Build command: python -m streamlit run thisfile -- --streamlit
-cmd = [sys.executable, "-m", "streamlit", "run", __file__, "--", "--streamlit", "--server.port", str(STREAMLIT_PORT)]
-streamlit_proc = subprocess.Popen(cmd)
-print(f"Streamlit launched (PID {streamlit_proc.pid}). Visit http://localhost:{STREAMLIT_PORT}")
-
-try:
-    # Keep launcher alive while child processes run
-    while True:
-        time.sleep(1.0)
-        # if streamlit process ends, exit
-        if streamlit_proc.poll() is not None:
-            print("Streamlit process ended.")
-            break
-except KeyboardInterrupt:
-    print("Interrupted — shutting down.")
-finally:
-    # attempt to terminate streamlit if still running
-    try:
-        streamlit_proc.terminate()
-    except Exception:
-        pass
-    print("Launcher exiting.")
-```
-
-if **name** == "**main**":
-main()
+#!/usr/bin/env python3
+"""
+Single-file app: one FastAPI (uvicorn) server on port 8000 that
+
+* accepts large file uploads directly to disk (streamed)
+* serves the web UI at / (pure-browser uploader + ffmpeg streaming controls for YouTube Live)
+Run:
+  python htjdg.py
+and open http://localhost:8000
+
+Requirements (pip):
+fastapi uvicorn[standard] uvloop
+optional: python-multipart — only needed for the multipart /upload route (the browser uploader uses /upload_raw)
+optional (Linux): liburing==2024.5.3 (python-liburing) — batches upload disk writes through io_uring
+  (later releases replaced the io_uring_* functions with a Ring/Cqe API and are ignored)
+
+Notes:
+
+* The UI is a static page; the file list, encoder options and ffmpeg log come from small JSON routes.
+* Uploaded files are saved under ./uploads and appear in the UI's dropdown after each upload.
+* This is intended for localhost / trusted environment. If deploying public-facing, add auth and TLS.
+"""
+
+import os
+import sys
+import mmap
+import importlib.util
+import subprocess
+from pathlib import Path
+
+try:
+    import liburing  # python-liburing; Linux only
+except ImportError:
+    liburing = None
+
+# IoUringBatchEngine is written against the function API of liburing 2024.5.3; newer releases dropped it
+if liburing is not None and not all(hasattr(liburing, name) for name in (
+    "io_uring", "io_uring_cqe", "iovec", "io_uring_queue_init", "io_uring_get_sqe", "io_uring_prep_write",
+    "io_uring_submit_and_wait", "io_uring_wait_cqe", "io_uring_cqe_seen", "io_uring_queue_exit",
+)):
+    liburing = None
+
+# ---------- Common configuration ----------
+
+UPLOAD_DIR = Path("./uploads")
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+FASTAPI_HOST = "0.0.0.0"
+FASTAPI_PORT = 8000
+# uvicorn worker processes. The ffmpeg stream (process handle + log) lives in the worker that started it,
+# and requests are not pinned to a worker, so stream control needs a single worker.
+FASTAPI_WORKERS = 1
+
+CHUNK_SIZE = 1024 * 1024 * 4  # 4MB chunks; also the size of the page-aligned O_DIRECT staging blocks
+
+IO_URING_DEPTH = 256  # submission queue entries per ring
+IO_URING_BATCH_BLOCKS = 4  # staging blocks queued before one submit-and-wait
+
+# ---------- io_uring write batching (optional, Linux + python-liburing) ----------
+
+class IoUringBatchEngine:
+    """
+    Sequential writer for one upload: blocks are queued as io_uring write SQEs and submitted
+    together with a single io_uring_submit_and_wait, instead of one write(2) per block.
+    queue() never blocks (no syscall); flush() does, so callers run it in an executor.
+    Queued buffers must not be modified until flush() returns.
+    """
+
+    def __init__(self, fd, depth=IO_URING_DEPTH):
+        self.fd = fd
+        self.depth = depth
+        self.offset = 0
+        # (iovec, data) pairs: the buffers must stay alive until their write completes
+        self.pending = []
+        self.pending_bytes = 0
+        self.ring = liburing.io_uring()
+        self.cqe = liburing.io_uring_cqe()
+        liburing.io_uring_queue_init(depth, self.ring, 0)
+
+    def queue(self, data):
+        """Queue a write of `data` at the current offset."""
+        iov = liburing.iovec(data)
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_write(sqe, self.fd, iov.iov_base, iov.iov_len, self.offset)
+        self.pending.append((iov, data))
+        self.offset += len(data)
+        self.pending_bytes += len(data)
+
+    def flush(self):
+        """Submit all queued writes with one syscall and drain their completions."""
+        count = len(self.pending)
+        if not count:
+            return
+        liburing.io_uring_submit_and_wait(self.ring, count)
+        written = 0
+        for _ in range(count):
+            liburing.io_uring_wait_cqe(self.ring, self.cqe)
+            res = self.cqe.res
+            liburing.io_uring_cqe_seen(self.ring, self.cqe)
+            if res < 0:
+                raise OSError(-res, os.strerror(-res))
+            written += res
+        if written != self.pending_bytes:
+            raise OSError(f"io_uring short write ({written} of {self.pending_bytes} bytes)")
+        self.pending.clear()
+        self.pending_bytes = 0
+
+    def close(self):
+        liburing.io_uring_queue_exit(self.ring)
+
+# ---------- ffmpeg helpers ----------
+
+VAAPI_DEVICE = "/dev/dri/renderD128"
+# hardware H.264 encoders in order of preference for automatic selection; libx264 (CPU) is the fallback
+HW_ENCODERS = ["h264_nvenc", "h264_qsv", "h264_vaapi"]
+
+def hw_encoder_works(encoder):
+    """Trial-encode a few blank frames with `encoder`; False if the GPU/driver behind it is missing."""
+    input_args, filter_args = [], []
+    if encoder == "h264_vaapi":
+        input_args = ["-vaapi_device", VAAPI_DEVICE]
+        filter_args = ["-vf", "format=nv12,hwupload"]
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", *input_args,
+        "-f", "lavfi", "-i", "nullsrc=s=256x256:d=0.1", *filter_args, "-c:v", encoder, "-f", "null", "-",
+    ]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=15).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+def probe_hw_encoders():
+    """
+    Return the entries of HW_ENCODERS that actually work here. Distro builds list h264_nvenc/h264_qsv in
+    `ffmpeg -encoders` even without the hardware, so each listed encoder must also pass a trial encode.
+    """
+    try:
+        out = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    # lines look like " V....D h264_nvenc           NVIDIA NVENC H.264 encoder"
+    names = {line.split()[1] for line in out.splitlines() if len(line.split()) > 1}
+    found = [enc for enc in HW_ENCODERS if enc in names]
+    # VAAPI is compiled into most Linux builds; it is only usable with a render node
+    if "h264_vaapi" in found and not os.path.exists(VAAPI_DEVICE):
+        found.remove("h264_vaapi")
+    return [enc for enc in found if hw_encoder_works(enc)]
+
+def probe_codecs(path):
+    """Return (video_codec, audio_codec) of the first video/audio stream in path (None if absent or unknown)."""
+    try:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "stream=codec_name,codec_type", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=30,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+    codecs = {}
+    for line in out.splitlines():
+        # "h264,video" / "aac,audio"
+        parts = line.strip().split(",")
+        if len(parts) == 2:
+            codecs.setdefault(parts[1], parts[0])
+    return codecs.get("video"), codecs.get("audio")
+
+def can_stream_copy(codecs, is_shorts):
+    """H.264 + AAC sources can go to YouTube as-is, unless Shorts mode has to rescale them."""
+    return not is_shorts and tuple(codecs) == ("h264", "aac")
+
+def build_ffmpeg_cmd(video_path, output_url, is_shorts, encoder="libx264"):
+    """
+    Build the ffmpeg command that loops video_path to output_url, encoding video with `encoder`.
+    encoder="copy" remuxes without decoding/encoding (see can_stream_copy).
+    """
+    if encoder == "copy":
+        return ["ffmpeg", "-re", "-stream_loop", "-1", "-i", video_path, "-c", "copy", "-f", "flv", output_url]
+    input_args = []
+    filters = ["scale=720:1280"] if is_shorts else []
+    if encoder == "h264_nvenc":
+        codec_args = ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "ll"]
+    elif encoder == "h264_qsv":
+        codec_args = ["-c:v", "h264_qsv", "-preset", "veryfast"]
+    elif encoder == "h264_vaapi":
+        # decode on the CPU and upload frames to the GPU: works for any input codec, unlike -hwaccel vaapi
+        input_args = ["-vaapi_device", VAAPI_DEVICE]
+        filters += ["format=nv12", "hwupload"]
+        codec_args = ["-c:v", "h264_vaapi"]
+    else:
+        codec_args = ["-c:v", "libx264", "-preset", "veryfast"]
+    scale_arg = ["-vf", ",".join(filters)] if filters else []
+    return [
+        "ffmpeg", *input_args, "-re", "-stream_loop", "-1", "-i", video_path,
+        *codec_args, "-b:v", "2500k",
+        "-maxrate", "2500k", "-bufsize", "5000k",
+        "-g", "60", "-keyint_min", "60",
+        "-c:a", "aac", "-b:a", "128k",
+    ] + scale_arg + ["-f", "flv", output_url]
+
+# ---------- Web UI (served by FastAPI at /) ----------
+
+# Static page: the file list, encoder options and ffmpeg log are fetched from the JSON routes below,
+# so nothing is re-rendered server-side when the user clicks something.
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="id">
+<head>
+  <meta charset="utf-8" />
+  <title>YouTube Live — Upload Besar</title>
+  <style>
+    body { font-family: sans-serif; margin: 24px; }
+    .cols { display: flex; gap: 32px; flex-wrap: wrap; }
+    .col-main { flex: 2; min-width: 320px; }
+    .col-side { flex: 1; min-width: 260px; }
+    pre#log { background: #111; color: #ddd; padding: 8px; height: 420px; overflow: auto; font-size: 12px; }
+    .msg { font-size: 13px; margin-top: 6px; }
+  </style>
+</head>
+<body>
+  <h1>YouTube Live — Upload Besar 🎥</h1>
+  <h4>Cara kerja singkat</h4>
+  <ul>
+    <li>Backend FastAPI menerima upload <b>langsung</b> dari browser dan menulis ke disk per-chunk.</li>
+    <li>Pilih file yang sudah diupload (folder <code>./uploads</code>) lalu mulai streaming menggunakan <code>ffmpeg</code>.</li>
+  </ul>
+
+  <div class="cols">
+    <div class="col-main">
+      <h3>Uploader browser</h3>
+      <p>Pilih file (mp4, mkv, mov, flv, ...) lalu upload. Upload besar (GB) didukung karena file ditulis langsung ke disk.</p>
+      <input id="fileInput" type="file" />
+      <div style="margin-top:8px;">
+        <button id="uploadBtn">Upload ke backend</button>
+      </div>
+      <div id="progressWrap" style="margin-top:8px; display:none;">
+        <progress id="pbar" value="0" max="100" style="width:100%;"></progress>
+        <div id="status" class="msg"></div>
+      </div>
+
+      <h3>File yang tersedia di server (./uploads)</h3>
+      <select id="fileSelect"><option value="">-- pilih --</option></select>
+      <button id="refreshBtn">Muat ulang daftar file</button>
+    </div>
+
+    <div class="col-side">
+      <h3>Kontrol Streaming (ffmpeg)</h3>
+      <label>Stream Key YouTube (dibutuhkan untuk mulai)<br /><input id="streamKey" type="password" style="width:100%;" /></label>
+      <p><label><input id="isShorts" type="checkbox" /> Mode Shorts (720x1280)</label></p>
+      <p>Encoder video:<br /><span id="encoders"><label><input type="radio" name="encoder" value="auto" checked /> Otomatis (GPU jika ada) </label><label><input type="radio" name="encoder" value="libx264" /> libx264 (CPU) </label></span></p>
+      <p>Tombol Start/Stop menjalankan/menghentikan <code>ffmpeg</code> pada mesin yang menjalankan aplikasi ini.</p>
+      <button id="startBtn">Mulai Streaming</button>
+      <button id="stopBtn">Hentikan Streaming</button>
+      <div id="streamMsg" class="msg"></div>
+      <pre id="log"></pre>
+    </div>
+  </div>
+
+  <hr />
+  <b>Catatan teknis &amp; tips</b>
+  <ul>
+    <li>Uploader mengirim file langsung ke FastAPI yang menulis file ke <code>./uploads</code> dalam chunk (4MB).</li>
+    <li>Jangan jalankan ini di server publik tanpa HTTPS dan otentikasi — tambahkan proteksi jika perlu.</li>
+    <li>Jika ingin resume/partial upload, kita bisa tambahkan chunked-resume logic (lebih kompleks).</li>
+  </ul>
+
+  <script>
+    const $ = (id) => document.getElementById(id);
+
+    async function loadFiles() {
+      const selected = $('fileSelect').value;
+      const files = await (await fetch('/files')).json();
+      $('fileSelect').innerHTML = '<option value="">-- pilih --</option>';
+      for (const name of files) {
+        const opt = document.createElement('option');
+        opt.value = opt.textContent = name;
+        opt.selected = name === selected;
+        $('fileSelect').appendChild(opt);
+      }
+    }
+
+    // auto and libx264 are in the page already; the probe behind /encoders can take a few seconds
+    async function loadEncoders() {
+      const hw = await (await fetch('/encoders')).json();
+      for (const enc of hw) {
+        const label = document.createElement('label');
+        label.innerHTML = '<input type="radio" name="encoder" value="' + enc + '" /> ' + enc + ' ';
+        $('encoders').appendChild(label);
+      }
+    }
+
+    let logSeq = -1;
+    async function loadLog() {
+      const data = await (await fetch('/stream/log?since=' + logSeq)).json();
+      // nothing new since the last poll: skip the redraw
+      if (data.seq === logSeq) return;
+      logSeq = data.seq;
+      $('log').textContent = data.lines.join('\\n');
+    }
+
+    async function postJSON(url, body) {
+      const res = await fetch(url, {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(body || {})});
+      const data = await res.json();
+      $('streamMsg').innerText = res.ok ? data.message : (data.detail || res.status);
+      loadLog();
+    }
+
+    $('uploadBtn').addEventListener('click', () => {
+      const f = $('fileInput').files[0];
+      if (!f) {
+        alert('Pilih file dulu');
+        return;
+      }
+      // XHR rather than fetch: it is the only API that reports upload progress
+      const xhr = new XMLHttpRequest();
+      xhr.open('POST', '/upload_raw', true);
+      // raw body upload: filename travels in a header (URI-encoded, headers must be latin-1)
+      xhr.setRequestHeader('X-Filename', encodeURIComponent(f.name));
+      xhr.setRequestHeader('Content-Type', 'application/octet-stream');
+
+      xhr.upload.addEventListener('progress', (e) => {
+        if (e.lengthComputable) {
+          const pct = Math.round((e.loaded / e.total) * 100);
+          $('pbar').value = pct;
+          $('status').innerText = 'Uploading: ' + pct + '% — ' + (e.loaded / (1024*1024)).toFixed(2) + ' MB';
+          $('progressWrap').style.display = 'block';
+        }
+      });
+      xhr.onload = function() {
+        if (xhr.status === 200) {
+          $('status').innerText = 'Upload selesai: ' + xhr.responseText;
+          loadFiles();
+        } else {
+          $('status').innerText = 'Upload gagal. Status: ' + xhr.status + ' ' + xhr.responseText;
+        }
+      };
+      xhr.onerror = function() {
+        $('status').innerText = 'Upload error (network).';
+      };
+      xhr.send(f);
+    });
+
+    $('refreshBtn').addEventListener('click', loadFiles);
+    $('startBtn').addEventListener('click', () => postJSON('/stream/start', {
+      filename: $('fileSelect').value,
+      stream_key: $('streamKey').value,
+      is_shorts: $('isShorts').checked,
+      encoder: (document.querySelector('input[name="encoder"]:checked') || {value: 'auto'}).value,
+    }));
+    $('stopBtn').addEventListener('click', () => postJSON('/stream/stop'));
+
+    loadFiles();
+    loadEncoders();
+    loadLog();
+    // 4 Hz: ffmpeg's start-up burst is coalesced into a few redraws, unchanged polls cost nothing
+    setInterval(loadLog, 250);
+  </script>
+</body>
+</html>
+"""
+
+# ---------- FastAPI app (uploads, UI and stream control) ----------
+
+def create_fastapi_app():
+    """
+    App factory used by the uvicorn workers (`uvicorn htjdg:create_fastapi_app --factory`).
+    Each worker process imports this module and builds its own app instance.
+    """
+    import asyncio
+    import collections
+    import contextlib
+    import functools
+    import re
+    import uuid
+    from urllib.parse import unquote
+    from fastapi import FastAPI, Request, UploadFile, File, HTTPException
+    from fastapi.responses import HTMLResponse, JSONResponse
+    from pydantic import BaseModel
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        # don't leave ffmpeg streaming after the server stops
+        stop_stream()
+        if app.state.ffmpeg_pump is not None:
+            await app.state.ffmpeg_pump
+
+    app = FastAPI(title="Large Upload Backend", lifespan=lifespan)
+    app.state.ffmpeg_proc = None  # asyncio.subprocess.Process
+    app.state.stream_start_lock = asyncio.Lock()
+    app.state.ffmpeg_pump = None  # task copying ffmpeg's output into ffmpeg_log (referenced so it isn't GC'd)
+    # only the last 30 lines are shown, so only keep those (ffmpeg runs for hours)
+    app.state.ffmpeg_log = collections.deque(maxlen=30)
+    app.state.ffmpeg_log_seq = 0  # bumped on every append, so pollers can tell when nothing changed
+
+    # No CORS middleware: the bundled UI is same-origin, and allowing other origins would let any web page
+    # the user visits list ./uploads and start streams.
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/", response_class=HTMLResponse)
+    async def index():
+        return INDEX_HTML
+
+    def open_dest(filename):
+        """
+        Create a new file for `filename` under UPLOAD_DIR and return (fd, dest_path).
+        O_EXCL makes creation atomic, also across workers: if the name is taken, retry once with a
+        random suffix instead of probing for a free name. Raises OSError if that fails too.
+        """
+        # O_BINARY only exists (and only matters) on Windows
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        dest_path = UPLOAD_DIR / filename
+        try:
+            return os.open(dest_path, flags, 0o644), dest_path
+        except FileExistsError:
+            base, ext = os.path.splitext(filename)
+            # keep the suffixed name within NAME_MAX (255 bytes); errors="ignore" drops a split UTF-8 sequence
+            room = 255 - len(".12345678") - len(ext.encode())
+            base = base.encode()[:max(room, 0)].decode(errors="ignore")
+            dest_path = UPLOAD_DIR / f"{base}.{uuid.uuid4().hex[:8]}{ext}"
+            return os.open(dest_path, flags, 0o644), dest_path
+
+    def set_direct(fd, enabled):
+        """Toggle O_DIRECT (bypass the page cache) on fd. Returns False where it is not supported."""
+        if not hasattr(os, "O_DIRECT"):
+            return False
+        import fcntl
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        try:
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_DIRECT if enabled else flags & ~os.O_DIRECT)
+        except OSError:
+            return False  # e.g. tmpfs rejects O_DIRECT with EINVAL
+        return True
+
+    def write_all(fd, data):
+        # os.write may write less than requested; loop until the whole buffer is on disk
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def write_tail(fd, direct, offset, data):
+        # O_DIRECT needs block-aligned lengths, so the short final block is written through the page cache
+        if direct:
+            set_direct(fd, False)
+        # io_uring writes at explicit offsets and does not move the file position
+        os.lseek(fd, offset, os.SEEK_SET)
+        write_all(fd, data)
+
+    def create_engine(fd):
+        # io_uring can still be unavailable at runtime (old kernel, seccomp in containers)
+        if liburing is None:
+            return None
+        try:
+            return IoUringBatchEngine(fd)
+        except Exception:
+            return None  # fall back to os.write rather than failing the upload
+
+    def load_fallocate():
+        """
+        Resolve the C library's fallocate(2) wrapper once, or None where there is none (non-Linux, odd libcs).
+        Used instead of os.posix_fallocate: glibc emulates that on filesystems without fallocate support by
+        writing into every block, which would double the upload's I/O.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            # musl has no fallocate64: its plain fallocate already takes a 64-bit off_t
+            fn = getattr(libc, "fallocate64", None) or libc.fallocate
+            fn.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+            return fn
+        except (AttributeError, OSError):
+            return None
+
+    fallocate = load_fallocate()
+
+    def preallocate(fd, size):
+        """
+        Reserve the extents up front so the write loop doesn't extend the file block by block.
+        Best effort: where the filesystem doesn't support it the call just fails and is ignored.
+        """
+        try:
+            fallocate(fd, 0, 0, size)  # -1 (e.g. EOPNOTSUPP) only means nothing was preallocated
+        except (AttributeError, OSError):
+            pass
+
+    async def save_stream(fd, chunks=None, readinto=None, size_hint=None):
+        """
+        Write an async iterable of byte chunks to fd (closed afterwards), returning the number of bytes written.
+        Sources that can fill a caller-supplied buffer pass `readinto` (an async callable taking a
+        writable memoryview and returning the byte count, 0 at EOF) instead, and are read straight into
+        the staging blocks, so no per-chunk bytes objects are allocated.
+        Chunks are coalesced into page-aligned CHUNK_SIZE blocks (mmap) so full blocks can be written
+        with O_DIRECT; the page cache is only used for the final partial block and dropped at the end.
+        Blocks go through IoUringBatchEngine when available, otherwise os.write in the default executor.
+        With a `size_hint` (the expected size, e.g. Content-Length) the file is preallocated first.
+        """
+        loop = asyncio.get_running_loop()
+        total_written = 0
+        engine = None
+        current = 0  # index of the block being filled
+        fill = 0  # bytes staged in the current block
+
+        async def write_block():
+            nonlocal current
+            if engine is None:
+                await loop.run_in_executor(None, write_all, fd, blocks[current])
+            else:
+                engine.queue(blocks[current])
+                if current == len(blocks) - 1:
+                    # every block is in flight: complete them before any is refilled
+                    await loop.run_in_executor(None, engine.flush)
+            current = (current + 1) % len(blocks)
+
+        try:
+            if size_hint and fallocate is not None:
+                await loop.run_in_executor(None, preallocate, fd, size_hint)
+            direct = set_direct(fd, True)
+            engine = create_engine(fd)
+            # queued io_uring writes keep their block busy until flush(), so the engine gets several blocks
+            blocks = [memoryview(mmap.mmap(-1, CHUNK_SIZE)) for _ in range(IO_URING_BATCH_BLOCKS if engine else 1)]
+            if readinto is not None:
+                while True:
+                    n = await readinto(blocks[current][fill:])
+                    if not n:
+                        break
+                    fill += n
+                    total_written += n
+                    if fill == CHUNK_SIZE:
+                        await write_block()
+                        fill = 0
+            else:
+                async for chunk in chunks:
+                    view = memoryview(chunk)
+                    while view:
+                        n = min(len(view), CHUNK_SIZE - fill)
+                        blocks[current][fill:fill + n] = view[:n]
+                        fill += n
+                        view = view[n:]
+                        if fill == CHUNK_SIZE:
+                            await write_block()
+                            fill = 0
+                    total_written += len(chunk)
+            if engine is not None:
+                await loop.run_in_executor(None, engine.flush)
+            if fill:
+                await loop.run_in_executor(None, write_tail, fd, direct, total_written - fill, blocks[current][:fill])
+            if size_hint and total_written < size_hint:
+                # don't leave preallocated space past the data that actually arrived
+                os.ftruncate(fd, total_written)
+            if hasattr(os, "posix_fadvise"):
+                # write-once blobs: don't leave them occupying the page cache
+                await loop.run_in_executor(None, os.posix_fadvise, fd, 0, total_written, os.POSIX_FADV_DONTNEED)
+        finally:
+            if engine is not None:
+                engine.close()
+            os.close(fd)
+        return total_written
+
+    def copy_spooled_file(src_fd, fd):
+        """
+        Copy src_fd's contents to fd (closed afterwards) with sendfile(2), entirely in the kernel.
+        Linux only (other platforms only allow sendfile to sockets). Returns the number of bytes copied.
+        """
+        size = os.fstat(src_fd).st_size
+        # fd is left without O_DIRECT: sendfile copies arbitrary offsets/lengths, which O_DIRECT would reject
+        try:
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            os.posix_fadvise(fd, 0, offset, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+        return offset
+
+    def upload_file_readinto(file):
+        """readinto source for save_stream over an UploadFile's spooled file."""
+        loop = asyncio.get_running_loop()
+        # SpooledTemporaryFile only has readinto() from Python 3.11; its wrapped BytesIO/temp file always does
+        spool = getattr(file.file, "_file", file.file)
+
+        async def readinto(buf):
+            # mirrors UploadFile.read: in-memory spools are read inline, on-disk ones in the executor
+            if getattr(file.file, "_rolled", True):
+                return await loop.run_in_executor(None, spool.readinto, buf)
+            return spool.readinto(buf)
+
+        return readinto
+
+    def remove_partial(dest_path):
+        # attempt to remove partially written file
+        try:
+            if dest_path.exists():
+                dest_path.unlink()
+        except:
+            pass
+
+    # FastAPI refuses to register File(...) routes without python-multipart; /upload_raw doesn't need it
+    if importlib.util.find_spec("python_multipart") or importlib.util.find_spec("multipart"):
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            """
+            Accepts a standard multipart/form-data upload with field name 'file'.
+            Starlette has already spooled the part to a temp file; on Linux, once that has rolled over to disk,
+            it is copied with sendfile (no userspace copy). Otherwise it is streamed to disk (see save_stream).
+            Returns simple JSON with filename and size.
+            """
+            # sanitize filename
+            filename = os.path.basename(file.filename)
+            if not filename:
+                raise HTTPException(status_code=400, detail="Missing filename")
+            try:
+                fd, dest_path = open_dest(filename)
+            except OSError as e:
+                raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+            try:
+                # same check Starlette uses: small parts stay in memory and have no real fd
+                if sys.platform.startswith("linux") and getattr(file.file, "_rolled", False):
+                    loop = asyncio.get_running_loop()
+                    total_written = await loop.run_in_executor(None, copy_spooled_file, file.file.fileno(), fd)
+                else:
+                    total_written = await save_stream(fd, readinto=upload_file_readinto(file))
+            except Exception as e:
+                remove_partial(dest_path)
+                raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+            return JSONResponse({"filename": str(dest_path.name), "size_bytes": total_written})
+
+    @app.api_route("/upload_raw", methods=["POST", "PUT"])
+    async def upload_raw(request: Request):
+        """
+        Accepts the file as the raw request body (POST or PUT), with the (URI-encoded) filename in the
+        X-Filename header. No multipart parsing and no SpooledTemporaryFile: body chunks are written to
+        disk as they arrive. When Content-Length is sent, a body that ends short is rejected and discarded.
+        Returns the same JSON as /upload.
+        """
+        # sanitize filename
+        filename = os.path.basename(unquote(request.headers.get("x-filename", "")))
+        if not filename:
+            raise HTTPException(status_code=400, detail="Missing X-Filename header")
+        content_length = request.headers.get("content-length")
+        expected_size = int(content_length) if content_length and content_length.isdigit() else None
+        try:
+            fd, dest_path = open_dest(filename)
+        except OSError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+        try:
+            total_written = await save_stream(fd, request.stream(), size_hint=expected_size)
+        except Exception as e:
+            remove_partial(dest_path)
+            raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+        if expected_size is not None and total_written != expected_size:
+            remove_partial(dest_path)
+            raise HTTPException(status_code=400, detail=f"Incomplete upload: got {total_written} of {expected_size} bytes")
+
+        return JSONResponse({"filename": str(dest_path.name), "size_bytes": total_written})
+
+    # ---- file list + ffmpeg stream control ----
+
+    @app.get("/files")
+    async def files():
+        # scandir's d_type tells files apart without an extra stat() per entry
+        with os.scandir(UPLOAD_DIR) as it:
+            return sorted(entry.name for entry in it if entry.is_file())
+
+    @functools.lru_cache(maxsize=None)
+    def cached_hw_encoders():
+        # the set of encoders doesn't change while the app runs: probe ffmpeg once
+        return probe_hw_encoders()
+
+    @functools.lru_cache(maxsize=128)
+    def cached_codecs(path, mtime):
+        # keyed on mtime so a re-uploaded file with the same name is probed again
+        return probe_codecs(path)
+
+    @app.get("/encoders")
+    async def encoders():
+        """Hardware encoders usable for streaming (libx264 and "auto" are always available)."""
+        return await asyncio.get_running_loop().run_in_executor(None, cached_hw_encoders)
+
+    class StreamStart(BaseModel):
+        filename: str
+        stream_key: str
+        is_shorts: bool = False
+        encoder: str = "auto"
+
+    def stream_running():
+        proc = app.state.ffmpeg_proc
+        return proc is not None and proc.returncode is None
+
+    def stop_stream():
+        """Kill the running ffmpeg, if any. Returns whether one was running."""
+        proc, app.state.ffmpeg_proc = app.state.ffmpeg_proc, None
+        if proc is None or proc.returncode is not None:
+            return False
+        proc.kill()  # the pump task reaps it
+        return True
+
+    def append_log(lines):
+        app.state.ffmpeg_log.extend(lines)
+        app.state.ffmpeg_log_seq += 1
+
+    async def pump_ffmpeg_log(proc):
+        """
+        Copy ffmpeg's output into the log on the event loop (no reader thread), then reap the process.
+        ffmpeg ends its progress lines with a bare CR, so split on CR as well as LF: a plain readline()
+        would keep growing one "line" for as long as the stream runs.
+        """
+        partial = b""
+        try:
+            while True:
+                data = await proc.stdout.read(65536)
+                if not data:
+                    break
+                *lines, partial = re.split(rb"[\r\n]", partial + data)
+                # one log update per read, however many lines it carried
+                batch = [ln.decode(errors="replace").strip() for ln in lines if ln.strip()]
+                if batch:
+                    append_log(batch)
+            if partial.strip():
+                append_log([partial.decode(errors="replace").strip()])
+        except Exception as e:
+            append_log(["ffmpeg reader error: " + str(e)])
+        await proc.wait()
+
+    @app.post("/stream/start")
+    async def stream_start(req: StreamStart):
+        """
+        Start looping an uploaded file to YouTube Live with ffmpeg.
+        encoder "auto" picks the first hardware encoder (libx264 otherwise), or `-c copy` for sources
+        YouTube accepts as-is.
+        """
+        # held from the running check until ffmpeg_proc is set: a double-click must not spawn two ffmpegs
+        async with app.state.stream_start_lock:
+            if stream_running():
+                raise HTTPException(status_code=409, detail="Streaming sudah berjalan — hentikan dulu.")
+            video_path = UPLOAD_DIR / os.path.basename(req.filename)
+            if not req.filename or not video_path.is_file():
+                raise HTTPException(status_code=400, detail="Pilih file dulu dari dropdown 'File yang tersedia di server'.")
+            if not req.stream_key:
+                raise HTTPException(status_code=400, detail="Masukkan stream key YouTube.")
+            video_path = str(video_path.resolve())
+
+            loop = asyncio.get_running_loop()
+            hw_encoders = await loop.run_in_executor(None, cached_hw_encoders)
+            if req.encoder == "auto":
+                encoder = hw_encoders[0] if hw_encoders else "libx264"
+                codecs = await loop.run_in_executor(None, cached_codecs, video_path, os.path.getmtime(video_path))
+                if can_stream_copy(codecs, req.is_shorts):
+                    encoder = "copy"
+            elif req.encoder in ["libx264"] + hw_encoders:
+                encoder = req.encoder
+            else:
+                raise HTTPException(status_code=400, detail=f"Encoder tidak dikenal: {req.encoder}")
+
+            output_url = f"rtmp://a.rtmp.youtube.com/live2/{req.stream_key}"
+            cmd = build_ffmpeg_cmd(video_path, output_url, req.is_shorts, encoder)
+
+            app.state.ffmpeg_log.clear()
+            append_log(["Menjalankan: " + " ".join(cmd)])
+            try:
+                # start ffmpeg as subprocess; stream stdout
+                proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            except Exception as e:
+                append_log(["Gagal menjalankan ffmpeg: " + str(e)])
+                raise HTTPException(status_code=500, detail="Gagal menjalankan ffmpeg. Pastikan ffmpeg terinstal di PATH.")
+            app.state.ffmpeg_proc = proc
+            # the UI polls /stream/log
+            app.state.ffmpeg_pump = asyncio.create_task(pump_ffmpeg_log(proc))
+            return {"message": "Streaming dimulai — periksa log."}
+
+    @app.post("/stream/stop")
+    async def stream_stop():
+        if not stop_stream():
+            return {"message": "Tidak ada proses ffmpeg berjalan."}
+        append_log(["ffmpeg dihentikan oleh user."])
+        return {"message": "Streaming dihentikan (ffmpeg killed)."}
+
+    @app.get("/stream/log")
+    async def stream_log(since: int = -1):
+        """Last log lines plus a sequence number; lines are omitted when `since` is already current."""
+        seq = app.state.ffmpeg_log_seq
+        if since == seq:
+            return {"running": stream_running(), "seq": seq, "lines": None}
+        return {"running": stream_running(), "seq": seq, "lines": list(app.state.ffmpeg_log)}
+
+    return app
+
+# ---------- Entrypoint logic ----------
+
+def main():
+    import uvicorn
+
+    this_file = Path(__file__).resolve()
+    # Pin uvloop/httptools explicitly; both are missing on some platforms (e.g. uvloop on Windows).
+    loop_impl = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http_impl = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(f"Starting server — visit http://localhost:{FASTAPI_PORT}")
+    # Import string + factory (rather than an app object) so FASTAPI_WORKERS > 1 keeps working.
+    uvicorn.run(
+        f"{this_file.stem}:create_fastapi_app", factory=True, app_dir=str(this_file.parent),
+        host=FASTAPI_HOST, port=FASTAPI_PORT, workers=FASTAPI_WORKERS,
+        loop=loop_impl, http=http_impl, log_level="info",
+    )
+
+if __name__ == "__main__":
+    main()